@@ -2,11 +2,65 @@
 Capacity planning and resource analysis
 """
 
-from typing import Dict, Any, List, Tuple
-from collections import defaultdict
+import functools
+import sys
+from collections.abc import Mapping
+from typing import Dict, Any, Iterable, Iterator, List, Tuple, Union
 from .models import ResourceAmount, ResourceRequirements, NodeCapacity, AppResources
 
 
+# Usage bars are sliced from prebuilt strings; there are only BAR_LENGTH + 1 fill levels
+BAR_LENGTH = 40
+_BAR_FILLED = '█' * BAR_LENGTH
+_BAR_EMPTY = '░' * BAR_LENGTH
+
+
+@functools.lru_cache(maxsize=None)
+def _usage_bar(filled: int) -> str:
+    """Render a usage bar with `filled` of BAR_LENGTH cells filled"""
+    return _BAR_FILLED[:filled] + _BAR_EMPTY[filled:]
+
+
+def _group_stats(rows: List[Tuple[float, float, float, float]], cpu_capacity: float,
+                 memory_capacity: float, replicas: int) -> Tuple[Tuple[float, ...], Tuple[float, ...]]:
+    """Compute usage totals and percentages for one node group.
+
+    rows holds one (cpu_req, cpu_lim, mem_req, mem_lim) tuple per app. Returns
+    (cpu_req, cpu_lim, mem_req, mem_lim, cpu_capacity, mem_capacity) totals across
+    all replicas, and (cpu_req, cpu_lim, mem_req, mem_lim) percentages of capacity.
+    """
+    # Calculate total requests and limits in a single pass, then scale to all replicas
+    cpu_request = cpu_limit = memory_request = memory_limit = 0
+    for row_cpu_request, row_cpu_limit, row_memory_request, row_memory_limit in rows:
+        cpu_request += row_cpu_request
+        cpu_limit += row_cpu_limit
+        memory_request += row_memory_request
+        memory_limit += row_memory_limit
+    cpu_request *= replicas
+    cpu_limit *= replicas
+    memory_request *= replicas
+    memory_limit *= replicas
+    
+    # Total capacity across all nodes in this group
+    total_cpu_capacity = cpu_capacity * replicas
+    total_memory_capacity = memory_capacity * replicas
+    
+    # Percentages are based on requests (scheduling) and limits; zero capacity reports 0%
+    if total_cpu_capacity:
+        cpu_request_pct = (cpu_request / total_cpu_capacity) * 100
+        cpu_limit_pct = (cpu_limit / total_cpu_capacity) * 100
+    else:
+        cpu_request_pct = cpu_limit_pct = 0
+    if total_memory_capacity:
+        memory_request_pct = (memory_request / total_memory_capacity) * 100
+        memory_limit_pct = (memory_limit / total_memory_capacity) * 100
+    else:
+        memory_request_pct = memory_limit_pct = 0
+    
+    totals = (cpu_request, cpu_limit, memory_request, memory_limit, total_cpu_capacity, total_memory_capacity)
+    return totals, (cpu_request_pct, cpu_limit_pct, memory_request_pct, memory_limit_pct)
+
+
 class CapacityPlanner:
     """Analyzes resource usage and capacity for node groups"""
     
@@ -14,9 +68,25 @@ class CapacityPlanner:
         self.platform_config = platform_config
         self.node_selectors = platform_config.get('nodeSelectors', {})
         self.resource_profiles = platform_config.get('resourceProfiles', {})
+        # Parsed profiles are shared by every app using them; capacities are
+        # only valid for the apps_config they were resolved from
+        self._profile_cache: Dict[str, ResourceRequirements] = dict(platform_config.get('parsedResourceProfiles', {}))
+        self._capacity_cache: Dict[str, NodeCapacity] = {}
+        self._capacity_source = None
     
     def get_node_capacity(self, node_selector: str, apps_config: Dict[str, Any]) -> NodeCapacity:
         """Get capacity for a node type, preferring maniforge.yaml 'nodes' overrides"""
+        if apps_config is not self._capacity_source:
+            self._capacity_cache.clear()
+            self._capacity_source = apps_config
+        
+        capacity = self._capacity_cache.get(node_selector)
+        if capacity is None:
+            capacity = self._capacity_cache[node_selector] = self._resolve_node_capacity(node_selector, apps_config)
+        return capacity
+    
+    def _resolve_node_capacity(self, node_selector: str, apps_config: Dict[str, Any]) -> NodeCapacity:
+        """Parse capacity for a node type from 'nodes' overrides or platform nodeSelectors"""
         # Prefer capacities defined in maniforge.yaml under 'nodes'
         nodes_cfg = apps_config.get('nodes', {}) if apps_config else {}
         cfg = nodes_cfg.get(node_selector, {})
@@ -50,29 +120,17 @@ class CapacityPlanner:
             count=int(capacity.get('count', 1))
         )
     
-    def get_app_resources(self, app_name: str, app_config: Dict[str, Any], 
-                          cluster_config: Dict[str, Any]) -> AppResources:
-        """Extract resource requirements for an app"""
+    def get_app_resources(self, app_name: str, app_config: Dict[str, Any],
+                          default_profile: str = None, default_node_selector: str = 'default') -> AppResources:
+        """Extract resource requirements for an app, falling back to the cluster defaults"""
         # Determine the profile to use
-        profile_name = app_config.get('profile', cluster_config.get('defaults', {}).get('profile'))
-        profile = self.resource_profiles.get(profile_name, {})
-        
-        if not profile:
-            # Default minimal resources
-            profile = {
-                'cpu': {'requests': '100m', 'limits': '500m'},
-                'memory': {'requests': '128Mi', 'limits': '512Mi'}
-            }
-        
-        resources = ResourceRequirements(
-            cpu_request=ResourceAmount.parse_cpu(profile['cpu']['requests']),
-            cpu_limit=ResourceAmount.parse_cpu(profile['cpu']['limits']),
-            memory_request=ResourceAmount.parse_memory(profile['memory']['requests']),
-            memory_limit=ResourceAmount.parse_memory(profile['memory']['limits'])
-        )
+        profile_name = app_config.get('profile', default_profile)
+        resources = self._profile_cache.get(profile_name)
+        if resources is None:
+            resources = self._profile_cache[profile_name] = self._resources_for_profile(profile_name)
         
         # Determine node selector
-        node_selector = app_config.get('nodeSelector', cluster_config.get('defaults', {}).get('nodeSelector', 'default'))
+        node_selector = app_config.get('nodeSelector', default_node_selector)
         
         # Default assumption: replicas will be set to node count during analysis
         replicas = 1
@@ -85,46 +143,64 @@ class CapacityPlanner:
             resources=resources
         )
     
-    def analyze_capacity(self, apps_config: Dict[str, Any]) -> Dict[str, Any]:
-        """Analyze capacity usage across all node types"""
+    def _resources_for_profile(self, profile_name: str) -> ResourceRequirements:
+        """Parse the requests and limits of a resource profile"""
+        profile = self.resource_profiles.get(profile_name, {})
+        
+        if not profile:
+            # Default minimal resources
+            profile = {
+                'cpu': {'requests': '100m', 'limits': '500m'},
+                'memory': {'requests': '128Mi', 'limits': '512Mi'}
+            }
+        
+        return ResourceRequirements.from_profile(profile)
+    
+    def _group_apps(self, apps_config: Dict[str, Any]) -> Dict[str, Tuple[List[AppResources], List[Tuple[float, float, float, float]]]]:
+        """Group apps by node selector (in first-seen order).
+
+        Each group holds the AppResources used for reporting and a flat
+        (cpu_req, cpu_lim, mem_req, mem_lim) row per app used for the totals.
+        """
         apps = apps_config.get('apps', {})
-        cluster_config = apps_config.get('cluster', {})
+        cluster_defaults = apps_config.get('cluster', {}).get('defaults', {})
+        default_profile = cluster_defaults.get('profile')
+        default_node_selector = cluster_defaults.get('nodeSelector', 'default')
         
-        # Group apps by node selector
-        apps_by_node = defaultdict(list)
+        apps_by_node: Dict[str, Tuple[List[AppResources], List[Tuple[float, float, float, float]]]] = {}
         
         for app_name, app_config in apps.items():
-            app_resources = self.get_app_resources(app_name, app_config, cluster_config)
-            apps_by_node[app_resources.node_selector].append(app_resources)
-        
-        # Calculate usage per node type
-        analysis = {}
+            app_resources = self.get_app_resources(app_name, app_config, default_profile, default_node_selector)
+            resources = app_resources.resources
+            group = apps_by_node.get(app_resources.node_selector)
+            if group is None:
+                group = apps_by_node[app_resources.node_selector] = ([], [])
+            group[0].append(app_resources)
+            group[1].append((
+                resources.cpu_request.value,
+                resources.cpu_limit.value,
+                resources.memory_request.value,
+                resources.memory_limit.value,
+            ))
         
-        for node_selector, apps_list in apps_by_node.items():
+        return apps_by_node
+    
+    def iter_capacity_analysis(self, apps_config: Dict[str, Any]) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """Yield (node_selector, analysis) per node type, computing each group on demand"""
+        for node_selector, (apps_list, rows) in self._group_apps(apps_config).items():
             capacity = self.get_node_capacity(node_selector, apps_config)
             
             # Effective replicas assumption: 1 per node for each app on this node type
             effective_replicas = max(1, capacity.count)
             
-            # Calculate total requests and limits across all replicas
-            total_cpu_request = sum(app.resources.cpu_request.value for app in apps_list) * effective_replicas
-            total_cpu_limit = sum(app.resources.cpu_limit.value for app in apps_list) * effective_replicas
-            total_memory_request = sum(app.resources.memory_request.value for app in apps_list) * effective_replicas
-            total_memory_limit = sum(app.resources.memory_limit.value for app in apps_list) * effective_replicas
-            
-            # Total capacity across all nodes in this group
-            total_cpu_capacity = capacity.cpu.value * effective_replicas
-            total_memory_capacity = capacity.memory.value * effective_replicas
-            
-            # Calculate percentages based on requests (more important for scheduling)
-            cpu_request_pct = (total_cpu_request / total_cpu_capacity) * 100 if total_cpu_capacity else 0
-            memory_request_pct = (total_memory_request / total_memory_capacity) * 100 if total_memory_capacity else 0
-            
-            # Calculate percentages based on limits
-            cpu_limit_pct = (total_cpu_limit / total_cpu_capacity) * 100 if total_cpu_capacity else 0
-            memory_limit_pct = (total_memory_limit / total_memory_capacity) * 100 if total_memory_capacity else 0
+            totals, percentages = _group_stats(
+                rows, capacity.cpu.value, capacity.memory.value, effective_replicas
+            )
+            (total_cpu_request, total_cpu_limit, total_memory_request, total_memory_limit,
+             total_cpu_capacity, total_memory_capacity) = totals
+            cpu_request_pct, cpu_limit_pct, memory_request_pct, memory_limit_pct = percentages
             
-            analysis[node_selector] = {
+            yield node_selector, {
                 'capacity': capacity,
                 'apps': apps_list,
                 'usage': {
@@ -142,87 +218,111 @@ class CapacityPlanner:
                     'memory_limit': memory_limit_pct,
                 }
             }
-        
-        return analysis
     
-    def print_capacity_analysis(self, analysis: Dict[str, Any]):
-        """Print capacity analysis in a readable format"""
-        if not analysis:
-            return
+    def analyze_capacity(self, apps_config: Dict[str, Any]) -> Dict[str, Any]:
+        """Analyze capacity usage across all node types"""
+        return dict(self.iter_capacity_analysis(apps_config))
+    
+    def print_capacity_analysis(self, analysis: Union[Dict[str, Any], Iterable[Tuple[str, Dict[str, Any]]]]):
+        """Print capacity analysis in a readable format.
+
+        Accepts the dict from analyze_capacity() or the stream from iter_capacity_analysis().
+        """
+        groups = analysis.items() if isinstance(analysis, Mapping) else analysis
         
-        print("\n📊 Capacity Planning Analysis")
-        print("=" * 80)
+        out: List[str] = []
         
-        for node_selector, data in analysis.items():
+        for node_selector, data in groups:
             capacity = data['capacity']
             usage = data['usage']
             percentages = data['percentages']
             apps = data['apps']
             
-            print(f"\n🖥️  Node Type: {node_selector}")
-            print(f"   Nodes: {capacity.count}")
-            print(f"   Per-node Capacity: CPU={capacity.cpu.format_cpu()} Memory={capacity.memory.format_memory()}")
+            out.append(f"\n🖥️  Node Type: {node_selector}")
+            out.append(f"   Nodes: {capacity.count}")
+            out.append(f"   Per-node Capacity: CPU={capacity.cpu.format_cpu()} Memory={capacity.memory.format_memory()}")
             total_cpu_cap = usage['total_cpu_capacity'].format_cpu()
             total_mem_cap = usage['total_memory_capacity'].format_memory()
-            print(f"   Total Capacity: CPU={total_cpu_cap} Memory={total_mem_cap}")
+            out.append(f"   Total Capacity: CPU={total_cpu_cap} Memory={total_mem_cap}")
             if capacity.disk:
-                print(f"   Disk (per node): {capacity.disk.format_memory()}")
-            print(f"   Apps: {len(apps)}")
-            print()
+                out.append(f"   Disk (per node): {capacity.disk.format_memory()}")
+            out.append(f"   Apps: {len(apps)}")
+            out.append("")
             
             # CPU Analysis
-            print("   CPU Usage:")
-            print(f"     Requests: {usage['cpu_request'].format_cpu()} / {total_cpu_cap} ({percentages['cpu_request']:.1f}%)")
-            self._print_usage_bar(percentages['cpu_request'])
-            print(f"     Limits:   {usage['cpu_limit'].format_cpu()} / {total_cpu_cap} ({percentages['cpu_limit']:.1f}%)")
-            self._print_usage_bar(percentages['cpu_limit'])
-            print()
+            out.append("   CPU Usage:")
+            out.append(f"     Requests: {usage['cpu_request'].format_cpu()} / {total_cpu_cap} ({percentages['cpu_request']:.1f}%)")
+            out.append(self._format_usage_bar(percentages['cpu_request']))
+            out.append(f"     Limits:   {usage['cpu_limit'].format_cpu()} / {total_cpu_cap} ({percentages['cpu_limit']:.1f}%)")
+            out.append(self._format_usage_bar(percentages['cpu_limit']))
+            out.append("")
             
             # Memory Analysis
-            print("   Memory Usage:")
-            print(f"     Requests: {usage['memory_request'].format_memory()} / {total_mem_cap} ({percentages['memory_request']:.1f}%)")
-            self._print_usage_bar(percentages['memory_request'])
-            print(f"     Limits:   {usage['memory_limit'].format_memory()} / {total_mem_cap} ({percentages['memory_limit']:.1f}%)")
-            self._print_usage_bar(percentages['memory_limit'])
-            print()
+            out.append("   Memory Usage:")
+            out.append(f"     Requests: {usage['memory_request'].format_memory()} / {total_mem_cap} ({percentages['memory_request']:.1f}%)")
+            out.append(self._format_usage_bar(percentages['memory_request']))
+            out.append(f"     Limits:   {usage['memory_limit'].format_memory()} / {total_mem_cap} ({percentages['memory_limit']:.1f}%)")
+            out.append(self._format_usage_bar(percentages['memory_limit']))
+            out.append("")
             
             # Status indicator
             max_request_pct = max(percentages['cpu_request'], percentages['memory_request'])
             if max_request_pct > 100:
-                print(f"   ⚠️  WARNING: Over capacity by {max_request_pct - 100:.1f}% (requests)")
+                out.append(f"   ⚠️  WARNING: Over capacity by {max_request_pct - 100:.1f}% (requests)")
             elif max_request_pct > 80:
-                print(f"   ⚡ Near capacity ({max_request_pct:.1f}% used)")
+                out.append(f"   ⚡ Near capacity ({max_request_pct:.1f}% used)")
             else:
-                print(f"   ✅ Capacity available ({100 - max_request_pct:.1f}% free)")
+                out.append(f"   ✅ Capacity available ({100 - max_request_pct:.1f}% free)")
             
             # List apps
-            print("\n   Apps on this node type:")
+            out.append("\n   Apps on this node type:")
             for app in apps:
                 cpu_req = app.resources.cpu_request.format_cpu()
                 mem_req = app.resources.memory_request.format_memory()
-                print(f"     • {app.app_name}: CPU={cpu_req} Memory={mem_req}")
-        
-        print("\n" + "=" * 80)
-        print("\n⚠️  Capacity Planning Notes:")
-        print("   • Assumes 1 replica per node for each app on a node type (DaemonSets and node-pinned deployments)")
-        print("   • Multi-replica deployments on the same node type may under-count resources")
-        print("   • Analysis is based on resource requests (used for scheduling decisions)")
-        print("   • Use this as a guideline for node sizing and capacity planning\n")
+                out.append(f"     • {app.app_name}: CPU={cpu_req} Memory={mem_req}")
+        
+        if not out:
+            # No node groups to report
+            return
+        
+        out[:0] = ["\n📊 Capacity Planning Analysis", "=" * 80]
+        out.append("\n" + "=" * 80)
+        out.append("\n⚠️  Capacity Planning Notes:")
+        out.append("   • Assumes 1 replica per node for each app on a node type (DaemonSets and node-pinned deployments)")
+        out.append("   • Multi-replica deployments on the same node type may under-count resources")
+        out.append("   • Analysis is based on resource requests (used for scheduling decisions)")
+        out.append("   • Use this as a guideline for node sizing and capacity planning\n")
+        
+        sys.stdout.write("\n".join(out) + "\n")
+    
+    def capacity_summary(self, analysis: Dict[str, Any]) -> Dict[str, Any]:
+        """Numeric capacity analysis for machine consumers (CPU in millicores, memory in bytes)"""
+        summary = {}
+        for node_selector, data in analysis.items():
+            capacity = data['capacity']
+            summary[node_selector] = {
+                'nodes': capacity.count,
+                'capacity': {
+                    'cpu': capacity.cpu.value,
+                    'memory': capacity.memory.value,
+                    'disk': capacity.disk.value if capacity.disk else None,
+                },
+                'usage': {key: amount.value for key, amount in data['usage'].items()},
+                'percentages': dict(data['percentages']),
+                'apps': [app.app_name for app in data['apps']],
+            }
+        return summary
     
-    def _print_usage_bar(self, percentage: float):
-        """Print a visual usage bar"""
-        bar_length = 40
-        filled = int((percentage / 100) * bar_length)
-        filled = min(filled, bar_length)  # Cap at bar_length
+    def _format_usage_bar(self, percentage: float) -> str:
+        """Format a visual usage bar line"""
+        filled = int((percentage / 100) * BAR_LENGTH)
+        filled = max(0, min(filled, BAR_LENGTH))  # Clamp to 0..BAR_LENGTH
         
         if percentage > 100:
-            bar = '█' * bar_length
             symbol = '⚠️ '
         elif percentage > 80:
-            bar = '█' * filled + '░' * (bar_length - filled)
             symbol = '⚡'
         else:
-            bar = '█' * filled + '░' * (bar_length - filled)
             symbol = '  '
         
-        print(f"     {symbol}[{bar}]")
+        return f"     {symbol}[{_usage_bar(filled)}]"
@@ -2,17 +2,71 @@
 Configuration loading and validation
 """
 
+import functools
 import sys
 import os
 import yaml
+from collections.abc import Mapping
 from pathlib import Path
-from typing import Dict, Any, List
-from .profile_generator import ProfileGenerator
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Dict, Any, List
+from .utils import YamlDumper, load_yaml_cached
+
+if TYPE_CHECKING:
+    from .models import ResourceRequirements
 
 # Defaults and constants
 DEFAULT_PROFILE_C_SMALL = 'c.small'
 RESOURCE_PROFILES_FILE_ENV = 'MANIFORGE_RESOURCE_PROFILES_YAML'
 RESOURCE_PROFILES_FILENAME = os.getenv(RESOURCE_PROFILES_FILE_ENV, 'resource-profiles.yaml')
+NODE_CAPACITY_KEYS = frozenset(('cpu', 'cores', 'memory', 'mem'))
+
+# Built-in platform sections, shared read-only by every loaded config
+NETWORK_TYPES = MappingProxyType({
+    'clusterip': {'service': {'type': 'ClusterIP'}, 'podOptions': {}},
+    'nodeport': {'service': {'type': 'NodePort'}, 'podOptions': {}},
+    'loadbalancer': {'service': {'type': 'LoadBalancer'}, 'podOptions': {}},
+    'host': {'service': {'type': 'ClusterIP'}, 'podOptions': {'hostNetwork': True, 'dnsPolicy': 'ClusterFirstWithHostNet'}}
+})
+INGRESS_DEFAULTS = MappingProxyType({
+    'className': 'traefik',
+    'annotations': {
+        'traefik.ingress.kubernetes.io/router.entrypoints': 'websecure',
+        'traefik.ingress.kubernetes.io/router.tls': 'true',
+        'cert-manager.io/cluster-issuer': 'letsencrypt-dns'
+    }
+})
+HELM_CHART = MappingProxyType({'name': 'app-template', 'version': '4.4.0', 'repository': {'name': 'bjw-s', 'namespace': 'flux-system'}})
+
+# Minimal profile set used when no resource profiles file is present
+PROFILE_C_PICO = 'c.pico'
+PROFILE_R_LARGE = 'r.large'
+FALLBACK_RESOURCE_PROFILES = MappingProxyType({
+    PROFILE_C_PICO: {'cpu': {'requests': '100m', 'limits': '250m'}, 'memory': {'requests': '256Mi', 'limits': '512Mi'}},
+    DEFAULT_PROFILE_C_SMALL: {'cpu': {'requests': '250m', 'limits': '500m'}, 'memory': {'requests': '512Mi', 'limits': '1Gi'}},
+    PROFILE_R_LARGE: {'cpu': {'requests': '500m', 'limits': '1000m'}, 'memory': {'requests': '4Gi', 'limits': '8Gi'}}
+})
+
+
+@functools.lru_cache(maxsize=4)
+def _build_default_platform_config(profiles_path: str, profiles_mtime_ns: int) -> Dict[str, Any]:
+    """Build the default platform config; cached per profiles file path and mtime.
+
+    Sections are read-only mappings; copy a section before merging into it.
+    """
+    from .profile_generator import ProfileGenerator
+    
+    # Try to load resource profiles from YAML file (configurable via env)
+    resource_profiles = ProfileGenerator.load_profiles_for_config(profiles_path)
+
+    return {
+        # Fallback to minimal set if file doesn't exist
+        'resourceProfiles': MappingProxyType(resource_profiles) if resource_profiles else FALLBACK_RESOURCE_PROFILES,
+        'networkTypes': NETWORK_TYPES,
+        'nodeSelectors': {},
+        'ingressDefaults': INGRESS_DEFAULTS,
+        'helmChart': HELM_CHART,
+    }
 
 
 class ConfigLoader:
@@ -31,8 +85,7 @@ class ConfigLoader:
             print("Run 'maniforge init' to create a new configuration")
             sys.exit(1)
         
-        with open(self.config_file) as f:
-            self.config = yaml.safe_load(f) or {}
+        self.config = load_yaml_cached(self.config_file) or {}
         
         # Always use built-in defaults; do not load external platform files
         self.platform_config = self._default_platform_config()
@@ -41,12 +94,14 @@ class ConfigLoader:
         overrides_keys = ['resourceProfiles', 'networkTypes', 'ingressDefaults', 'helmChart', 'nodeSelectors']
         for key in overrides_keys:
             if key in self.config:
-                # Shallow merge is fine; structures are dicts
+                # Shallow merge is fine; structures are dicts. Defaults are shared
+                # read-only mappings, so merge into a fresh copy.
                 existing = self.platform_config.get(key, {})
                 incoming = self.config.get(key, {})
-                if isinstance(existing, dict) and isinstance(incoming, dict):
-                    existing.update(incoming)
-                    self.platform_config[key] = existing
+                if isinstance(existing, Mapping) and isinstance(incoming, dict):
+                    merged = dict(existing)
+                    merged.update(incoming)
+                    self.platform_config[key] = merged
                 else:
                     self.platform_config[key] = incoming
         
@@ -56,42 +111,38 @@ class ConfigLoader:
         for node_name in nodes_cfg.keys():
             node_selectors.setdefault(node_name, {'labels': {'type': node_name}})
         
+        # Parse every resource profile once up front so capacity planning only does lookups
+        self.platform_config['parsedResourceProfiles'] = self._parse_resource_profiles(
+            self.platform_config.get('resourceProfiles', {})
+        )
+        
         self.apps_config = self.config
     
+    @staticmethod
+    def _parse_resource_profiles(resource_profiles: Dict[str, Any]) -> Dict[str, 'ResourceRequirements']:
+        """Parse resource profile quantities into ResourceRequirements, keyed by profile name"""
+        from .models import ResourceRequirements
+        
+        parsed = {}
+        for profile_name, profile in resource_profiles.items():
+            try:
+                parsed[profile_name] = ResourceRequirements.from_profile(profile)
+            except (KeyError, TypeError, AttributeError, ValueError):
+                # Malformed profiles are only needed by capacity analysis, which parses them itself
+                continue
+        return parsed
+    
     def _default_platform_config(self):
         """Default settings used by maniforge (no external platform file)"""
-        # Try to load resource profiles from YAML file (configurable via env)
-        resource_profiles = ProfileGenerator.load_profiles_for_config(RESOURCE_PROFILES_FILENAME)
-        
-        # Fallback to minimal set if file doesn't exist
-        if not resource_profiles:
-            PROFILE_C_PICO = 'c.pico'
-            PROFILE_R_LARGE = 'r.large'
-            resource_profiles = {
-                PROFILE_C_PICO: {'cpu': {'requests': '100m', 'limits': '250m'}, 'memory': {'requests': '256Mi', 'limits': '512Mi'}},
-                DEFAULT_PROFILE_C_SMALL: {'cpu': {'requests': '250m', 'limits': '500m'}, 'memory': {'requests': '512Mi', 'limits': '1Gi'}},
-                PROFILE_R_LARGE: {'cpu': {'requests': '500m', 'limits': '1000m'}, 'memory': {'requests': '4Gi', 'limits': '8Gi'}}
-            }
-        
-        return {
-            'resourceProfiles': resource_profiles,
-            'networkTypes': {
-                'clusterip': {'service': {'type': 'ClusterIP'}, 'podOptions': {}},
-                'nodeport': {'service': {'type': 'NodePort'}, 'podOptions': {}},
-                'loadbalancer': {'service': {'type': 'LoadBalancer'}, 'podOptions': {}},
-                'host': {'service': {'type': 'ClusterIP'}, 'podOptions': {'hostNetwork': True, 'dnsPolicy': 'ClusterFirstWithHostNet'}}
-            },
-            'nodeSelectors': {},
-            'ingressDefaults': {
-                'className': 'traefik',
-                'annotations': {
-                    'traefik.ingress.kubernetes.io/router.entrypoints': 'websecure',
-                    'traefik.ingress.kubernetes.io/router.tls': 'true',
-                    'cert-manager.io/cluster-issuer': 'letsencrypt-dns'
-                }
-            },
-            'helmChart': {'name': 'app-template', 'version': '4.4.0', 'repository': {'name': 'bjw-s', 'namespace': 'flux-system'}}
-        }
+        profiles_path = os.path.abspath(RESOURCE_PROFILES_FILENAME)
+        try:
+            profiles_mtime_ns = os.stat(profiles_path).st_mtime_ns
+        except OSError:
+            profiles_mtime_ns = 0
+        # Sections stay shared; load() replaces any section it merges into
+        platform_config = dict(_build_default_platform_config(profiles_path, profiles_mtime_ns))
+        platform_config['nodeSelectors'] = {}
+        return platform_config
 
 
 class ConfigValidator:
@@ -101,30 +152,36 @@ class ConfigValidator:
         self.apps_config = apps_config
         self.platform_config = platform_config
     
-    def validate(self) -> bool:
-        """Validate configuration"""
+    def validate(self, file=None) -> bool:
+        """Validate configuration; errors are printed to file (default stdout)"""
         errors = []
         apps = self.apps_config.get('apps', {})
-        cluster_config = self.apps_config.get('cluster', {})
+        cluster_defaults = self.apps_config.get('cluster', {}).get('defaults', {})
+        default_profile = cluster_defaults.get('profile')
+        default_node_selector = cluster_defaults.get('nodeSelector')
         nodes_cfg = self.apps_config.get('nodes', {})
         
+        # Known names, resolved once for every app
+        valid_profiles = set(self.platform_config.get('resourceProfiles', {}))
+        valid_networks = set(self.platform_config.get('networkTypes', {}))
+        valid_node_selectors = set(self.platform_config.get('nodeSelectors', {})) | set(nodes_cfg)
+        
         for app_name, app_config in apps.items():
             if 'image' not in app_config:
                 errors.append(f"App '{app_name}': missing required field 'image'")
             
-            profile = app_config.get('profile', cluster_config.get('defaults', {}).get('profile'))
-            if profile and profile not in self.platform_config.get('resourceProfiles', {}):
+            profile = app_config.get('profile', default_profile)
+            if profile and profile not in valid_profiles:
                 errors.append(f"App '{app_name}': unknown profile '{profile}'")
             
             network = app_config.get('network', 'clusterip')
-            if network not in self.platform_config.get('networkTypes', {}):
+            if network not in valid_networks:
                 errors.append(f"App '{app_name}': unknown network type '{network}'")
             
             # Validate node selector exists either in platform nodeSelectors or nodes override
-            node_selector = app_config.get('nodeSelector', cluster_config.get('defaults', {}).get('nodeSelector'))
-            if node_selector:
-                if node_selector not in self.platform_config.get('nodeSelectors', {}) and node_selector not in nodes_cfg:
-                    errors.append(f"App '{app_name}': unknown nodeSelector '{node_selector}' (define in top-level nodes)")
+            node_selector = app_config.get('nodeSelector', default_node_selector)
+            if node_selector and node_selector not in valid_node_selectors:
+                errors.append(f"App '{app_name}': unknown nodeSelector '{node_selector}' (define in top-level nodes)")
         
         # Basic nodes config validation (optional)
         for node_name, node_spec in nodes_cfg.items():
@@ -138,13 +195,13 @@ class ConfigValidator:
                 except Exception:
                     errors.append(f"nodes.{node_name}.count must be an integer")
             # Validate at least one of cpu/memory present
-            if not any(k in node_spec for k in ('cpu', 'cores', 'memory', 'mem')):
+            if NODE_CAPACITY_KEYS.isdisjoint(node_spec):
                 errors.append(f"nodes.{node_name}: specify at least 'cpu' and 'memory' (or aliases 'cores'/'mem') for accurate capacity analysis")
         
         if errors:
-            print("❌ VALIDATION ERRORS:")
+            print("❌ VALIDATION ERRORS:", file=file)
             for error in errors:
-                print(f"  - {error}")
+                print(f"  - {error}", file=file)
             return False
         
         return True
@@ -190,7 +247,7 @@ class ConfigInitializer:
         }
         
         with open(config_file, 'w') as f:
-            yaml.dump(config, f, default_flow_style=False, sort_keys=False)
+            yaml.dump(config, f, Dumper=YamlDumper, default_flow_style=False, sort_keys=False)
         
         print(f"✅ Initialized maniforge project: {config_file}")
         print("Edit the configuration and run 'maniforge plan' to see what will be created")
@@ -2,16 +2,13 @@
 Core Maniforge application
 """
 
+import json
 import sys
 from pathlib import Path
 from typing import Dict, Any
 
 from .config import ConfigLoader, ConfigValidator, ConfigInitializer
 from .translator import AppTranslator
-from .differ import ManifestDiffer
-from .generator import ManifestGenerator
-from .capacity_planner import CapacityPlanner
-from .profile_generator import ProfileGenerator
 
 
 class Maniforge:
@@ -29,6 +26,8 @@ class Maniforge:
     
     def load_config(self):
         """Load configuration"""
+        from .capacity_planner import CapacityPlanner
+        
         self.config_loader.load()
         self.config = self.config_loader.config
         self.platform_config = self.config_loader.platform_config
@@ -39,18 +38,25 @@ class Maniforge:
         self.validator = ConfigValidator(self.apps_config, self.platform_config)
         self.capacity_planner = CapacityPlanner(self.platform_config)
     
-    def validate(self):
-        """Validate configuration"""
-        return self.validator.validate()
+    def validate(self, file=None):
+        """Validate configuration; errors are printed to file (default stdout)"""
+        return self.validator.validate(file)
     
-    def plan(self):
+    def plan(self, output_format: str = 'text'):
         """Show what changes would be made (like terraform plan)"""
-        print("🔍 Validating configuration...")
-        if not self.validate():
+        from .differ import ManifestDiffer
+        
+        as_text = output_format == 'text'
+        
+        if as_text:
+            print("🔍 Validating configuration...")
+        # Keep stdout parseable in JSON mode
+        if not self.validate(None if as_text else sys.stderr):
             sys.exit(1)
         
-        print("✅ Configuration is valid")
-        print("\n📋 Generating plan...")
+        if as_text:
+            print("✅ Configuration is valid")
+            print("\n📋 Generating plan...")
         
         output_dir = Path(self.config.get('output', {}).get('directory', 'apps'))
         
@@ -59,16 +65,29 @@ class Maniforge:
         differ.load_desired_state(self)
         
         changes = differ.get_changes()
-        differ.print_changes(changes)
         
-        # Add capacity planning analysis
-        analysis = self.capacity_planner.analyze_capacity(self.apps_config)
-        self.capacity_planner.print_capacity_analysis(analysis)
+        if as_text:
+            differ.print_changes(changes)
+            
+            # Add capacity planning analysis, streamed one node type at a time
+            self.capacity_planner.print_capacity_analysis(
+                self.capacity_planner.iter_capacity_analysis(self.apps_config)
+            )
+        else:
+            analysis = self.capacity_planner.analyze_capacity(self.apps_config)
+            plan = {
+                'changes': [{'action': action, 'app': app_name} for action, app_name, _, _ in changes],
+                'capacity': self.capacity_planner.capacity_summary(analysis),
+            }
+            json.dump(plan, sys.stdout, separators=(',', ':'))
+            sys.stdout.write("\n")
         
         return len(changes) > 0
     
     def apply(self):
         """Apply changes (like terraform apply)"""
+        from .generator import ManifestGenerator
+        
         print("🔍 Validating configuration...")
         if not self.validate():
             sys.exit(1)
@@ -89,8 +108,10 @@ class Maniforge:
         ConfigInitializer.init(Path(config_file), cluster_name)
     
     @staticmethod
-    def generate_profiles(output_dir: str = None, profiles_yaml: str = 'resource-profiles.yaml'):
+    def generate_profiles(output_dir: str = None, profiles_yaml: str = 'resource-profiles.yaml', archive: str = None):
         """Generate Kubernetes resource profile components"""
+        from .profile_generator import ProfileGenerator
+        
         print("📦 Generating resource profile components...")
         
         generator = ProfileGenerator(profiles_yaml)
@@ -100,6 +121,10 @@ class Maniforge:
             print(f"❌ {e}")
             sys.exit(1)
         
+        if archive is not None:
+            generator.generate_components_to_archive(Path(archive))
+            return
+        
         if output_dir is None:
             output_dir = '_components/resource-profiles'
         
@@ -2,12 +2,31 @@
 Manifest differ for showing changes
 """
 
+import os
 import yaml
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, Any, List, Tuple
+from typing import Dict, Any, Tuple
 from collections.abc import Mapping
 
-from .utils import build_helm_release
+from .utils import IO_WORKERS, build_chart_section, build_helm_release, YamlLoader
+
+# Paths into bjw-s-app-template values
+_MAIN_CONTAINER_PATH = ('controllers', 'main', 'containers', 'main')
+_IMAGE_PATH = _MAIN_CONTAINER_PATH + ('image',)
+
+# Marks an app directory without a helm-release.yaml
+_MISSING = object()
+
+
+def _read_manifest(manifest_file: str):
+    """Parse one generated helm-release.yaml, or return _MISSING if it does not exist"""
+    try:
+        with open(manifest_file, 'rb') as f:
+            data = f.read()
+    except FileNotFoundError:
+        return _MISSING
+    return yaml.load(data, Loader=YamlLoader)
 
 
 class ManifestDiffer:
@@ -22,56 +41,56 @@ class ManifestDiffer:
         if not output_dir.exists():
             return
         
-        for app_dir in output_dir.iterdir():
-            if app_dir.is_dir():
-                app_name = app_dir.name
-                manifest_file = app_dir / 'helm-release.yaml'
-                if manifest_file.exists():
-                    with open(manifest_file) as f:
-                        self.current_state[app_name] = yaml.safe_load(f)
+        # DirEntry caches the file type from readdir, so is_dir() costs no extra stat
+        app_names, manifest_files = [], []
+        with os.scandir(output_dir) as entries:
+            for entry in entries:
+                if entry.is_dir():
+                    app_names.append(entry.name)
+                    manifest_files.append(os.path.join(entry.path, 'helm-release.yaml'))
+        
+        # Manifests are independent, so load them concurrently; only the file reads overlap,
+        # as YAML parsing holds the GIL. map keeps directory order
+        with ThreadPoolExecutor(max_workers=IO_WORKERS) as executor:
+            for app_name, manifest in zip(app_names, executor.map(_read_manifest, manifest_files)):
+                if manifest is not _MISSING:
+                    self.current_state[app_name] = manifest
     
     def load_desired_state(self, generator):
         """Generate desired state in memory"""
         apps = generator.apps_config.get('apps', {})
         cluster_config = generator.apps_config.get('cluster', {})
+        chart = build_chart_section(generator.platform_config.get('helmChart', {}))
         
         for app_name, app_config in apps.items():
             values = generator.translator.translate_app(app_name, app_config, cluster_config)
-            
-            helm_chart_config = generator.platform_config.get('helmChart', {})
-            helm_release = build_helm_release(app_name, app_config, values, helm_chart_config)
+            helm_release = build_helm_release(app_name, app_config, values, chart)
             self.desired_state[app_name] = helm_release
     
     def get_changes(self):
         """Get list of changes"""
-        changes = []
+        current_state = self.current_state
+        desired_state = self.desired_state
+        creates = []
+        updates = []
         
-        # New apps
-        for app_name in self.desired_state:
-            if app_name not in self.current_state:
-                changes.append(('create', app_name, None, self.desired_state[app_name]))
+        # New and modified apps in one walk
+        for app_name, desired in desired_state.items():
+            if app_name not in current_state:
+                creates.append(('create', app_name, None, desired))
+                continue
+            current = current_state[app_name]
+            if current != desired:
+                updates.append(('update', app_name, current, desired))
         
         # Removed apps
-        for app_name in self.current_state:
-            if app_name not in self.desired_state:
-                changes.append(('delete', app_name, self.current_state[app_name], None))
-        
-        # Modified apps
-        for app_name in self.desired_state:
-            if app_name in self.current_state:
-                current = self._normalize_manifest(self.current_state[app_name])
-                desired = self._normalize_manifest(self.desired_state[app_name])
-                
-                if current != desired:
-                    changes.append(('update', app_name, self.current_state[app_name], self.desired_state[app_name]))
+        deletes = [
+            ('delete', app_name, current, None)
+            for app_name, current in current_state.items()
+            if app_name not in desired_state
+        ]
         
-        return changes
-    
-    def _normalize_manifest(self, manifest):
-        """Remove fields that change between runs"""
-        normalized = manifest.copy()
-        # Remove any fields that might change due to generation timestamps etc.
-        return normalized
+        return creates + deletes + updates
     
     def print_changes(self, changes):
         """Print changes in Terraform-like format"""
@@ -112,13 +131,14 @@ class ManifestDiffer:
             
             print()
     
-    def _get_nested(self, obj: Any, keys: List[str]):
+    def _get_nested(self, obj: Any, keys: Tuple[str, ...]):
         """Safely traverse nested dict-like structures.
         Returns the final value if all keys exist and each level is mapping-like; otherwise returns None.
         """
         cur = obj
         for k in keys:
-            if not isinstance(cur, Mapping):
+            # Plain dicts (all parsed and generated manifests) skip the ABC isinstance check
+            if type(cur) is not dict and not isinstance(cur, Mapping):
                 return None
             cur = cur.get(k)
             if cur is None:
@@ -127,7 +147,7 @@ class ManifestDiffer:
     
     def _get_image_from_values(self, values):
         """Extract image from helm values"""
-        image_config = self._get_nested(values, ['controllers', 'main', 'containers', 'main', 'image'])
+        image_config = self._get_nested(values, _IMAGE_PATH)
         if not isinstance(image_config, Mapping):
             return "unknown"
         repo = image_config.get('repository', '') or ''
@@ -136,7 +156,7 @@ class ManifestDiffer:
     
     def _get_resources_from_values(self, values):
         """Extract resources from helm values"""
-        container = self._get_nested(values, ['controllers', 'main', 'containers', 'main'])
+        container = self._get_nested(values, _MAIN_CONTAINER_PATH)
         if not isinstance(container, Mapping):
             return {}
         resources = container.get('resources', {})
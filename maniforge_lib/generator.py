@@ -2,11 +2,24 @@
 Manifest generator
 """
 
-import yaml
+import functools
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Dict, Any
 
-from .utils import build_helm_release
+from .utils import IO_WORKERS, build_chart_section, build_helm_release, dump_yaml, write_if_changed
+
+
+@functools.lru_cache(maxsize=None)
+def _render_kustomization(namespace: str) -> str:
+    """Render an app's kustomization.yaml; it only varies by namespace, so each is emitted once"""
+    kustomization = {
+        'apiVersion': 'kustomize.config.k8s.io/v1beta1',
+        'kind': 'Kustomization',
+        'namespace': namespace,
+        'resources': ['helm-release.yaml']
+    }
+    return dump_yaml(kustomization)
 
 
 class ManifestGenerator:
@@ -16,32 +29,36 @@ class ManifestGenerator:
         self.apps_config = apps_config
         self.platform_config = platform_config
         self.translator = translator
+        self.chart = build_chart_section(platform_config.get('helmChart', {}))
     
     def generate(self, output_dir: Path):
         """Generate manifests"""
         apps = self.apps_config.get('apps', {})
         cluster_config = self.apps_config.get('cluster', {})
         
-        for app_name, app_config in apps.items():
-            values = self.translator.translate_app(app_name, app_config, cluster_config)
-            
-            kustomization = {
-                'apiVersion': 'kustomize.config.k8s.io/v1beta1',
-                'kind': 'Kustomization',
-                'namespace': app_config.get('namespace', 'default'),
-                'resources': ['helm-release.yaml']
-            }
-            
-            helm_chart_config = self.platform_config.get('helmChart', {})
-            helm_release = build_helm_release(app_name, app_config, values, helm_chart_config)
-            
-            app_dir = output_dir / app_name
-            app_dir.mkdir(parents=True, exist_ok=True)
-            
-            with open(app_dir / 'kustomization.yaml', 'w') as f:
-                yaml.dump(kustomization, f, default_flow_style=False, sort_keys=False)
-            
-            with open(app_dir / 'helm-release.yaml', 'w') as f:
-                yaml.dump(helm_release, f, default_flow_style=False, sort_keys=False)
-            
-            print(f"  ✅ {app_name}")
+        # Apps are independent, so translate and write them concurrently; only the
+        # file I/O in write_if_changed overlaps, as YAML emission holds the GIL
+        with ThreadPoolExecutor(max_workers=IO_WORKERS) as executor:
+            futures = [
+                executor.submit(self._generate_app, output_dir, app_name, app_config, cluster_config)
+                for app_name, app_config in apps.items()
+            ]
+            # Report in config order so output is stable across runs
+            for future in futures:
+                print(f"  ✅ {future.result()}")
+    
+    def _generate_app(self, output_dir: Path, app_name: str, app_config: Dict[str, Any],
+                      cluster_config: Dict[str, Any]) -> str:
+        """Translate one app and write its manifests; returns the app name"""
+        values = self.translator.translate_app(app_name, app_config, cluster_config)
+        
+        helm_release = build_helm_release(app_name, app_config, values, self.chart)
+        
+        app_dir = output_dir / app_name
+        app_dir.mkdir(parents=True, exist_ok=True)
+        
+        # Leave unchanged files untouched so no-op applies cause no writes or GitOps churn
+        write_if_changed(app_dir / 'kustomization.yaml', _render_kustomization(app_config.get('namespace', 'default')))
+        write_if_changed(app_dir / 'helm-release.yaml', dump_yaml(helm_release))
+        
+        return app_name
@@ -2,11 +2,43 @@
 Data models and types for Maniforge
 """
 
+import functools
 from typing import Dict, Any, List, Tuple, Optional
 from dataclasses import dataclass
 
 
-@dataclass
+KIB = 1024
+MIB = 1024**2
+GIB = 1024**3
+
+# Memory unit multipliers, looked up by the last two characters (binary) or the last one (decimal)
+_BINARY_MEMORY_UNITS = {
+    'Ki': KIB,
+    'Mi': MIB,
+    'Gi': GIB,
+    'Ti': 1024**4,
+    'Pi': 1024**5,
+    'Ei': 1024**6,
+}
+_DECIMAL_MEMORY_UNITS = {
+    'K': 1000,
+    'M': 1000**2,
+    'G': 1000**3,
+    'T': 1000**4,
+    'P': 1000**5,
+    'E': 1000**6,
+}
+
+
+def _parse_number(value: str):
+    """Parse a quantity number, keeping integers exact and falling back to float"""
+    try:
+        return int(value)
+    except ValueError:
+        return float(value)
+
+
+@dataclass(slots=True, frozen=True)
 class ResourceAmount:
     """Represents a resource amount (CPU or memory)"""
     value: float  # Normalized value (CPU in millicores, memory in bytes)
@@ -15,33 +47,12 @@ class ResourceAmount:
     @staticmethod
     def parse_cpu(value: str) -> 'ResourceAmount':
         """Parse CPU value to millicores"""
-        if value.endswith('m'):
-            millicores = float(value[:-1])
-        else:
-            millicores = float(value) * 1000
-        return ResourceAmount(millicores, value)
+        return _parse_cpu(value)
     
     @staticmethod
     def parse_memory(value: str) -> 'ResourceAmount':
         """Parse memory value to bytes"""
-        units = {
-            'Ki': 1024,
-            'Mi': 1024**2,
-            'Gi': 1024**3,
-            'Ti': 1024**4,
-            'K': 1000,
-            'M': 1000**2,
-            'G': 1000**3,
-            'T': 1000**4,
-        }
-        
-        for suffix, multiplier in units.items():
-            if value.endswith(suffix):
-                number = float(value[:-len(suffix)])
-                return ResourceAmount(number * multiplier, value)
-        
-        # Assume bytes if no suffix
-        return ResourceAmount(float(value), value)
+        return _parse_memory(value)
     
     def format_cpu(self) -> str:
         """Format CPU value as string"""
@@ -52,26 +63,64 @@ class ResourceAmount:
     
     def format_memory(self) -> str:
         """Format memory value as string"""
-        if self.value >= 1024**3:
-            return f"{self.value / (1024**3):.2f}Gi"
-        elif self.value >= 1024**2:
-            return f"{self.value / (1024**2):.2f}Mi"
-        elif self.value >= 1024:
-            return f"{self.value / 1024:.2f}Ki"
+        if self.value >= GIB:
+            return f"{self.value / GIB:.2f}Gi"
+        elif self.value >= MIB:
+            return f"{self.value / MIB:.2f}Mi"
+        elif self.value >= KIB:
+            return f"{self.value / KIB:.2f}Ki"
         else:
             return f"{int(self.value)}"
 
 
-@dataclass
+# Parsers are memoized: profiles repeat a handful of quantity strings and
+# ResourceAmount is immutable, so the same instance can be handed out again
+@functools.lru_cache(maxsize=1024)
+def _parse_cpu(value: str) -> ResourceAmount:
+    """Parse CPU value to millicores"""
+    quantity = value.strip()
+    if quantity.endswith('m'):
+        millicores = _parse_number(quantity[:-1])
+    else:
+        millicores = _parse_number(quantity) * 1000
+    return ResourceAmount(millicores, value)
+
+
+@functools.lru_cache(maxsize=1024)
+def _parse_memory(value: str) -> ResourceAmount:
+    """Parse memory value to bytes"""
+    quantity = value.strip()
+    multiplier = _BINARY_MEMORY_UNITS.get(quantity[-2:])
+    if multiplier is not None:
+        return ResourceAmount(_parse_number(quantity[:-2]) * multiplier, value)
+    multiplier = _DECIMAL_MEMORY_UNITS.get(quantity[-1:])
+    if multiplier is not None:
+        return ResourceAmount(_parse_number(quantity[:-1]) * multiplier, value)
+    
+    # Assume bytes if no suffix
+    return ResourceAmount(_parse_number(quantity), value)
+
+
+@dataclass(slots=True, frozen=True)
 class ResourceRequirements:
     """Resource requests and limits"""
     cpu_request: ResourceAmount
     cpu_limit: ResourceAmount
     memory_request: ResourceAmount
     memory_limit: ResourceAmount
+    
+    @staticmethod
+    def from_profile(profile: Dict[str, Any]) -> 'ResourceRequirements':
+        """Parse a resource profile ({'cpu': {...}, 'memory': {...}}) into requirements"""
+        return ResourceRequirements(
+            cpu_request=ResourceAmount.parse_cpu(profile['cpu']['requests']),
+            cpu_limit=ResourceAmount.parse_cpu(profile['cpu']['limits']),
+            memory_request=ResourceAmount.parse_memory(profile['memory']['requests']),
+            memory_limit=ResourceAmount.parse_memory(profile['memory']['limits'])
+        )
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class NodeCapacity:
     """Node capacity information"""
     cpu: ResourceAmount
@@ -81,7 +130,7 @@ class NodeCapacity:
     disk: Optional[ResourceAmount] = None
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class AppResources:
     """Application resource requirements"""
     app_name: str
@@ -2,9 +2,160 @@
 Resource profile component generator
 """
 
-import yaml
+import functools
+import io
+import os
+import tarfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+import textwrap
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, List, Tuple
+
+import yaml
+
+from .utils import IO_WORKERS, ManifestDumper, dump_yaml, load_yaml_cached, write_if_changed
+
+# Profile type prefixes (the part of a profile name before the '.'), in documentation order
+PROFILE_TYPE_PREFIXES = ('p', 't', 'c', 'm', 'r')
+
+PROFILE_PATCHES_FILE = 'patches.yaml'
+CONTAINER_RESOURCES_PATH = '/spec/template/spec/containers/0/resources'
+HELMRELEASE_RESOURCES_PATH = '/spec/values/controllers/main/containers/main/resources'
+
+# Patch files have a fixed shape, so they are rendered from text templates
+# instead of being built as dicts and run through the YAML emitter
+RESOURCES_PATCH_TEMPLATE = (
+    "- op: add\n"
+    "  path: {path}\n"
+    "  value:\n"
+    "    requests:\n"
+    "      cpu: {cpu_req}\n"
+    "      memory: {mem_req}\n"
+    "    limits:\n"
+    "      cpu: {cpu_lim}\n"
+    "      memory: {mem_lim}\n"
+)
+MAIN_KUSTOMIZATION_HEADER = (
+    "apiVersion: kustomize.config.k8s.io/v1alpha1\n"
+    "kind: Component\n"
+)
+# The inline patch is the resources patch as a literal block; indenting the template
+# once here leaves a single format call per profile
+MAIN_PATCH_ENTRY_TEMPLATE = (
+    "- patch: |\n"
+    + textwrap.indent(RESOURCES_PATCH_TEMPLATE, '    ')
+    + "  target:\n"
+    "    labelSelector: {label_selector}\n"
+)
+
+# README sections, filled in per profile type and joined into a single string
+README_HEADER = (
+    "# Resource Profiles\n"
+    "\n"
+    "AWS-style resource allocation profiles for Kubernetes workloads.\n"
+    "\n"
+    "## Available Profiles\n"
+)
+README_TYPE_TEMPLATE = (
+    "### {type_name} - {ratio}\n"
+    "**Best for:** {use_cases}\n"
+    "\n"
+    "| Size | CPU Request | Memory Request | CPU Limit | Memory Limit | Use Case |\n"
+    "|------|-------------|----------------|-----------|--------------|----------|\n"
+)
+README_ROW_TEMPLATE = "| `{name}` | {cpu_req} | {mem_req} | {cpu_lim} | {mem_lim} | {description} |\n"
+README_USAGE = (
+    "## Usage\n"
+    "\n"
+    "Add the resource profile label to your workload:\n"
+    "\n"
+    "```yaml\n"
+    "metadata:\n"
+    "  labels:\n"
+    "    resource-profile: m.medium\n"
+    "```\n"
+    "\n"
+    "Then include this component in your kustomization:\n"
+    "\n"
+    "```yaml\n"
+    "components:\n"
+    "  - ../../_components/resource-profiles\n"
+    "```\n"
+)
+
+
+def _group_by_prefix(profiles: Dict[str, Any]) -> Dict[str, List[Tuple[str, Dict[str, Any]]]]:
+    """Group (name, config) pairs by profile type prefix in one pass, keeping file order"""
+    groups = {}
+    for profile_name, profile_config in profiles.items():
+        type_prefix, dot, _ = profile_name.partition('.')
+        if dot:
+            groups.setdefault(type_prefix, []).append((profile_name, profile_config))
+    return groups
+
+
+@functools.lru_cache(maxsize=None, typed=True)
+def _yaml_scalar(value: Any) -> str:
+    """Render one scalar as YAML, quoting it only where the emitter would"""
+    # An effectively unlimited width keeps the emitter from folding long scalars onto
+    # continuation lines; libyaml takes a C int, so float('inf') is not accepted
+    text = yaml.dump(value, Dumper=ManifestDumper, width=2**31 - 1)
+    if text.endswith('\n...\n'):
+        text = text[:-len('\n...\n')]
+    text = text.rstrip('\n')
+    if '\n' in text:
+        raise ValueError(f"Cannot render {value!r} as a single-line YAML scalar")
+    return text
+
+
+@functools.lru_cache(maxsize=None)
+def _render_profile_kustomization() -> str:
+    """Render a profile component's kustomization.yaml; it is identical for every profile, so it is emitted once"""
+    kustomization = {
+        'apiVersion': 'kustomize.config.k8s.io/v1alpha1',
+        'kind': 'Component',
+        'patches': [
+            {'path': PROFILE_PATCHES_FILE, 'target': {'kind': 'Deployment'}},
+            {'path': PROFILE_PATCHES_FILE, 'target': {'kind': 'StatefulSet'}},
+            {'path': PROFILE_PATCHES_FILE, 'target': {'kind': 'DaemonSet'}}
+        ]
+    }
+    return dump_yaml(kustomization)
+
+
+def _render_profile_files(profile_config: Dict[str, Any]) -> List[Tuple[str, str]]:
+    """Render the (filename, content) pairs of one profile component directory"""
+    return [
+        ('kustomization.yaml', _render_profile_kustomization()),
+        # Patches for regular Kubernetes resources
+        (PROFILE_PATCHES_FILE, _render_resources_patch(CONTAINER_RESOURCES_PATH, profile_config)),
+        # Patches for Flux HelmRelease resources
+        ('helmrelease-patches.yaml', _render_resources_patch(HELMRELEASE_RESOURCES_PATH, profile_config)),
+    ]
+
+
+def _add_archive_file(tar: tarfile.TarFile, name: str, content: str, mtime: float):
+    """Add a generated text file to a tar archive from memory"""
+    data = content.encode('utf-8')
+    info = tarfile.TarInfo(name)
+    info.size = len(data)
+    info.mode = 0o644
+    info.mtime = mtime
+    tar.addfile(info, io.BytesIO(data))
+
+
+def _render_resources_patch(path: str, profile_config: Dict[str, Any],
+                            template: str = RESOURCES_PATCH_TEMPLATE, **fields: str) -> str:
+    """Render the JSON patch that sets a container's resources from a profile"""
+    return template.format(
+        path=path,
+        cpu_req=_yaml_scalar(profile_config['cpu']['requests']),
+        mem_req=_yaml_scalar(profile_config['memory']['requests']),
+        cpu_lim=_yaml_scalar(profile_config['cpu']['limits']),
+        mem_lim=_yaml_scalar(profile_config['memory']['limits']),
+        **fields,
+    )
 
 
 class ProfileGenerator:
@@ -12,240 +163,197 @@ class ProfileGenerator:
     
     def __init__(self, profiles_yaml: str = 'resource-profiles.yaml'):
         self.profiles_yaml = Path(profiles_yaml)
-        self.profiles = None
-        self.profile_types = None
+        self._profiles = None
+        self._profile_types = None
+        self._by_prefix = None
+    
+    @property
+    def profiles(self) -> Dict[str, Any]:
+        """Resource profiles by name; loaded from profiles_yaml on first access"""
+        if self._profiles is None:
+            self.load_profiles()
+        return self._profiles
+    
+    @property
+    def profile_types(self) -> Dict[str, Any]:
+        """Profile type descriptions by prefix; loaded from profiles_yaml on first access"""
+        if self._profile_types is None:
+            self.load_profiles()
+        return self._profile_types
+    
+    @property
+    def _profiles_by_prefix(self) -> Dict[str, List[Tuple[str, Dict[str, Any]]]]:
+        """(name, config) pairs grouped by profile type prefix"""
+        if self._by_prefix is None:
+            self.load_profiles()
+        return self._by_prefix
     
     def load_profiles(self):
-        """Load resource profiles from YAML"""
-        if not self.profiles_yaml.exists():
-            raise FileNotFoundError(f"Resource profiles file not found: {self.profiles_yaml}")
+        """Load resource profiles from YAML.
+
+        The parse is shared with every other generator reading the same unchanged file.
+        """
+        profiles_path = self.profiles_yaml.resolve()
+        try:
+            stat = profiles_path.stat()
+        except FileNotFoundError:
+            raise FileNotFoundError(f"Resource profiles file not found: {self.profiles_yaml}") from None
         
-        with open(self.profiles_yaml) as f:
-            data = yaml.safe_load(f)
+        data = _read_profiles_file(str(profiles_path), stat.st_mtime_ns, stat.st_size)
         
-        self.profiles = data.get('profiles', {})
-        self.profile_types = data.get('profile_types', {})
+        self._profiles = data.get('profiles', {})
+        self._profile_types = data.get('profile_types', {})
+        self._by_prefix = _group_by_prefix(self._profiles)
     
     def generate_components(self, output_dir: Path):
         """Generate all Kubernetes component files"""
         output_dir.mkdir(parents=True, exist_ok=True)
         
         # Generate main kustomization.yaml with all patches
-        self._generate_main_kustomization(output_dir)
+        write_if_changed(output_dir / 'kustomization.yaml', self._render_main_kustomization())
+        
+        # Generate individual profile directories; output_dir exists, so one mkdir each suffices
+        profile_dirs = []
+        for profile_name in self.profiles:
+            profile_dir = output_dir / profile_name
+            try:
+                os.mkdir(profile_dir)
+            except FileExistsError:
+                pass
+            profile_dirs.append(profile_dir)
         
-        # Generate individual profile directories
-        for profile_name, profile_config in self.profiles.items():
-            self._generate_profile_component(output_dir, profile_name, profile_config)
+        # Components are independent small files, so write them concurrently
+        with ThreadPoolExecutor(max_workers=IO_WORKERS) as executor:
+            futures = [
+                executor.submit(self._generate_profile_component, profile_dir, profile_config)
+                for profile_dir, profile_config in zip(profile_dirs, self.profiles.values())
+            ]
+            for future in futures:
+                future.result()
         
         # Generate README
-        self._generate_readme(output_dir)
+        write_if_changed(output_dir / 'README.md', self._render_readme())
         
         print(f"✅ Generated {len(self.profiles)} resource profile components in {output_dir}")
     
-    def _generate_main_kustomization(self, output_dir: Path):
-        """Generate main kustomization.yaml with inline patches"""
-        kustomization = {
-            'apiVersion': 'kustomize.config.k8s.io/v1alpha1',
-            'kind': 'Component',
-            'patches': []
-        }
+    def generate_components_to_archive(self, archive_path: Path):
+        """Generate all Kubernetes component files into a .tar.gz archive instead of a directory"""
+        archive_path.parent.mkdir(parents=True, exist_ok=True)
+        mtime = time.time()
         
-        # Group profiles by type for organization
-        for type_prefix in ['p', 't', 'c', 'm', 'r']:
-            # Add comment header (as a patch comment won't work, so we'll just organize)
-            type_profiles = {k: v for k, v in self.profiles.items() if k.startswith(type_prefix + '.')}
+        # Same layout as generate_components, streamed as one sequential write
+        with tarfile.open(archive_path, 'w:gz') as tar:
+            _add_archive_file(tar, 'kustomization.yaml', self._render_main_kustomization(), mtime)
             
-            if type_profiles:
-                for profile_name, profile_config in type_profiles.items():
-                    cpu_req = profile_config['cpu']['requests']
-                    cpu_lim = profile_config['cpu']['limits']
-                    mem_req = profile_config['memory']['requests']
-                    mem_lim = profile_config['memory']['limits']
-                    
-                    patch_ops = [
-                        {
-                            'op': 'add',
-                            'path': '/spec/template/spec/containers/0/resources',
-                            'value': {
-                                'requests': {
-                                    'cpu': cpu_req,
-                                    'memory': mem_req,
-                                },
-                                'limits': {
-                                    'cpu': cpu_lim,
-                                    'memory': mem_lim,
-                                },
-                            },
-                        }
-                    ]
-                    patch = {
-                        'patch': yaml.dump(patch_ops, default_flow_style=False, sort_keys=False),
-                        'target': {
-                            'labelSelector': f"resource-profile={profile_name}"
-                        }
-                    }
-                    kustomization['patches'].append(patch)
+            for profile_name, profile_config in self.profiles.items():
+                dir_info = tarfile.TarInfo(profile_name)
+                dir_info.type = tarfile.DIRTYPE
+                dir_info.mode = 0o755
+                dir_info.mtime = mtime
+                tar.addfile(dir_info)
+                for filename, content in _render_profile_files(profile_config):
+                    _add_archive_file(tar, f"{profile_name}/{filename}", content, mtime)
+            
+            _add_archive_file(tar, 'README.md', self._render_readme(), mtime)
         
-        with open(output_dir / 'kustomization.yaml', 'w') as f:
-            yaml.dump(kustomization, f, default_flow_style=False, sort_keys=False)
+        print(f"✅ Generated {len(self.profiles)} resource profile components in {archive_path}")
     
-    def _generate_profile_component(self, output_dir: Path, profile_name: str, profile_config: Dict[str, Any]):
-        """Generate individual profile component directory"""
-        PATCHES_FILE = 'patches.yaml'
-        
-        profile_dir = output_dir / profile_name
-        profile_dir.mkdir(parents=True, exist_ok=True)
+    def _render_main_kustomization(self) -> str:
+        """Render main kustomization.yaml with inline patches"""
+        entries = []
         
-        # Generate kustomization.yaml
-        kustomization = {
-            'apiVersion': 'kustomize.config.k8s.io/v1alpha1',
-            'kind': 'Component',
-            'patches': [
-                {'path': PATCHES_FILE, 'target': {'kind': 'Deployment'}},
-                {'path': PATCHES_FILE, 'target': {'kind': 'StatefulSet'}},
-                {'path': PATCHES_FILE, 'target': {'kind': 'DaemonSet'}}
-            ]
-        }
-        
-        with open(profile_dir / 'kustomization.yaml', 'w') as f:
-            yaml.dump(kustomization, f, default_flow_style=False, sort_keys=False)
-        
-        # Generate patches.yaml (for regular Kubernetes resources)
-        cpu_req = profile_config['cpu']['requests']
-        cpu_lim = profile_config['cpu']['limits']
-        mem_req = profile_config['memory']['requests']
-        mem_lim = profile_config['memory']['limits']
-        
-        patches = [
-            {
-                'op': 'add',
-                'path': '/spec/template/spec/containers/0/resources',
-                'value': {
-                    'requests': {
-                        'cpu': cpu_req,
-                        'memory': mem_req
-                    },
-                    'limits': {
-                        'cpu': cpu_lim,
-                        'memory': mem_lim
-                    }
-                }
-            }
-        ]
-        
-        with open(profile_dir / PATCHES_FILE, 'w') as f:
-            yaml.dump(patches, f, default_flow_style=False, sort_keys=False)
-        
-        # Generate helmrelease-patches.yaml (for Flux HelmRelease resources)
-        helmrelease_patches = [
-            {
-                'op': 'add',
-                'path': '/spec/values/controllers/main/containers/main/resources',
-                'value': {
-                    'requests': {
-                        'cpu': cpu_req,
-                        'memory': mem_req
-                    },
-                    'limits': {
-                        'cpu': cpu_lim,
-                        'memory': mem_lim
-                    }
-                }
-            }
-        ]
+        # Group profiles by type for organization
+        for type_prefix in PROFILE_TYPE_PREFIXES:
+            # Add comment header (as a patch comment won't work, so we'll just organize)
+            for profile_name, profile_config in self._profiles_by_prefix.get(type_prefix, ()):
+                entries.append(_render_resources_patch(
+                    CONTAINER_RESOURCES_PATH, profile_config,
+                    template=MAIN_PATCH_ENTRY_TEMPLATE,
+                    label_selector=_yaml_scalar(f"resource-profile={profile_name}"),
+                ))
         
-        with open(profile_dir / 'helmrelease-patches.yaml', 'w') as f:
-            yaml.dump(helmrelease_patches, f, default_flow_style=False, sort_keys=False)
+        return MAIN_KUSTOMIZATION_HEADER + ('patches:\n' + ''.join(entries) if entries else 'patches: []\n')
     
-    def _generate_readme(self, output_dir: Path):
-        """Generate README with profile information"""
-        readme_lines = [
-            "# Resource Profiles",
-            "",
-            "AWS-style resource allocation profiles for Kubernetes workloads.",
-            "",
-            "## Available Profiles"
-        ]
+    def _generate_profile_component(self, profile_dir: Path, profile_config: Dict[str, Any]):
+        """Generate the files of an individual profile component directory"""
+        for filename, content in _render_profile_files(profile_config):
+            write_if_changed(profile_dir / filename, content)
+    
+    def _render_readme(self) -> str:
+        """Render README with profile information"""
+        parts = [README_HEADER]
         
         # Generate tables for each profile type
-        for type_prefix in ['p', 't', 'c', 'm', 'r']:
-            type_info = self.profile_types.get(type_prefix, {})
-            type_name = type_info.get('name', type_prefix.upper() + '-type')
-            ratio = type_info.get('ratio', '')
-            use_cases = type_info.get('use_cases', '')
+        for type_prefix in PROFILE_TYPE_PREFIXES:
+            type_profiles = self._profiles_by_prefix.get(type_prefix)
+            if not type_profiles:
+                continue
             
-            type_profiles = {k: v for k, v in self.profiles.items() if k.startswith(type_prefix + '.')}
-            
-            if type_profiles:
-                readme_lines.extend([
-                    f"### {type_name} - {ratio}",
-                    f"**Best for:** {use_cases}",
-                    "",
-                    "| Size | CPU Request | Memory Request | CPU Limit | Memory Limit | Use Case |",
-                    "|------|-------------|----------------|-----------|--------------|----------|"
-                ])
-                
-                for profile_name, profile_config in type_profiles.items():
-                    cpu_req = profile_config['cpu']['requests']
-                    cpu_lim = profile_config['cpu']['limits']
-                    mem_req = profile_config['memory']['requests']
-                    mem_lim = profile_config['memory']['limits']
-                    description = profile_config.get('description', '')
-                    
-                    readme_lines.append(
-                        f"| `{profile_name}` | {cpu_req} | {mem_req} | {cpu_lim} | {mem_lim} | {description} |"
-                    )
-                
-                readme_lines.append("")
-        
-        # Usage section
-        readme_lines.extend([
-            "## Usage",
-            "",
-            "Add the resource profile label to your workload:",
-            "",
-            "```yaml",
-            "metadata:",
-            "  labels:",
-            "    resource-profile: m.medium",
-            "```",
-            "",
-            "Then include this component in your kustomization:",
-            "",
-            "```yaml",
-            "components:",
-            "  - ../../_components/resource-profiles",
-            "```",
-            ""
-        ])
+            type_info = self.profile_types.get(type_prefix, {})
+            parts.append(README_TYPE_TEMPLATE.format(
+                type_name=type_info.get('name', type_prefix.upper() + '-type'),
+                ratio=type_info.get('ratio', ''),
+                use_cases=type_info.get('use_cases', ''),
+            ))
+            parts.extend(
+                README_ROW_TEMPLATE.format(
+                    name=profile_name,
+                    cpu_req=profile_config['cpu']['requests'],
+                    mem_req=profile_config['memory']['requests'],
+                    cpu_lim=profile_config['cpu']['limits'],
+                    mem_lim=profile_config['memory']['limits'],
+                    description=profile_config.get('description', ''),
+                )
+                for profile_name, profile_config in type_profiles
+            )
+            parts.append("\n")
         
-        with open(output_dir / 'README.md', 'w') as f:
-            f.write('\n'.join(readme_lines))
+        parts.append(README_USAGE)
+        return ''.join(parts)
     
     @staticmethod
     def load_profiles_for_config(profiles_yaml: str = 'resource-profiles.yaml') -> Dict[str, Any]:
-        """Load profiles in the format needed for maniforge config"""
-        profiles_path = Path(profiles_yaml)
-        if not profiles_path.exists():
+        """Load profiles in the format needed for maniforge config.
+
+        The result is cached per process and shared between callers; do not mutate it.
+        """
+        profiles_path = Path(profiles_yaml).resolve()
+        try:
+            stat = profiles_path.stat()
+        except FileNotFoundError:
             return {}
         
-        with open(profiles_path) as f:
-            data = yaml.safe_load(f)
-        
-        profiles = data.get('profiles', {})
-        
-        # Convert to the format expected by maniforge
-        resource_profiles = {}
-        for profile_name, profile_config in profiles.items():
-            resource_profiles[profile_name] = {
-                'cpu': {
-                    'requests': profile_config['cpu']['requests'],
-                    'limits': profile_config['cpu']['limits']
-                },
-                'memory': {
-                    'requests': profile_config['memory']['requests'],
-                    'limits': profile_config['memory']['limits']
-                }
+        return _load_profiles_for_config(str(profiles_path), stat.st_mtime_ns, stat.st_size)
+
+
+@functools.lru_cache(maxsize=None)
+def _read_profiles_file(profiles_path: str, mtime_ns: int, size: int) -> Dict[str, Any]:
+    """Parse a profiles file once per process; the mtime/size arguments invalidate the cache on edits.
+
+    The parsed document is shared by both profile loaders; do not mutate it.
+    """
+    return load_yaml_cached(Path(profiles_path)) or {}
+
+
+@functools.lru_cache(maxsize=None)
+def _load_profiles_for_config(profiles_path: str, mtime_ns: int, size: int) -> Dict[str, Any]:
+    """Convert a profiles file to maniforge's format; cached like _read_profiles_file"""
+    data = _read_profiles_file(profiles_path, mtime_ns, size)
+    
+    profiles = data.get('profiles', {})
+    
+    # Convert to the format expected by maniforge
+    resource_profiles = {}
+    for profile_name, profile_config in profiles.items():
+        resource_profiles[profile_name] = {
+            'cpu': {
+                'requests': profile_config['cpu']['requests'],
+                'limits': profile_config['cpu']['limits']
+            },
+            'memory': {
+                'requests': profile_config['memory']['requests'],
+                'limits': profile_config['memory']['limits']
             }
-        
-        return resource_profiles
+        }
+    
+    return resource_profiles
@@ -6,6 +6,18 @@ Translates high-level app config to bjw-s-app-template values
 from typing import Dict, Any, List
 from .utils import deep_merge
 
+# Ingress path routing is the same for every app; shared read-only across generated values
+INGRESS_PATHS = [
+    {
+        'path': '/',
+        'pathType': 'Prefix',
+        'service': {
+            'identifier': 'main',
+            'port': 'http'
+        }
+    }
+]
+
 
 class AppTranslator:
     """Translates high-level app config to bjw-s-app-template values"""
@@ -17,29 +29,50 @@ class AppTranslator:
         self.storage_types = platform_config.get('storageTypes', {})
         self.ingress_defaults = platform_config.get('ingressDefaults', {})
         self.node_selectors = platform_config.get('nodeSelectors', {})
+        
+        # Translations that depend only on a platform section name, shared by every app using it.
+        # Cached results end up in each app's values, so they must be treated as read-only.
+        self._resources_cache: Dict[str, Dict[str, Any]] = {}
+        self._node_selector_cache: Dict[str, Dict[str, Any]] = {}
+        self._network_cache: Dict[str, Dict[str, Any]] = {}
     
     def translate_image(self, image_str: str) -> Dict[str, Any]:
         """Convert image string to repository:tag format"""
-        if ':' in image_str:
-            repo, tag = image_str.rsplit(':', 1)
-        else:
-            repo, tag = image_str, 'latest'
+        # A ':' followed by a '/' is a registry port (registry:5000/img), not a tag separator
+        sep = image_str.rfind(':')
+        if sep < 0 or '/' in image_str[sep:]:
+            return {
+                'repository': image_str,
+                'tag': 'latest'
+            }
         
         return {
-            'repository': repo,
-            'tag': tag
+            'repository': image_str[:sep],
+            'tag': image_str[sep + 1:]
         }
     
     def translate_network(self, network_type: str, ports: List[Dict] = None) -> Dict[str, Any]:
         """Convert network type to service and pod configuration"""
+        # Without explicit ports the result depends only on the network type
+        if ports:
+            return self._build_network(network_type, ports)
+        network = self._network_cache.get(network_type)
+        if network is None:
+            network = self._network_cache[network_type] = self._build_network(network_type, ports)
+        return network
+    
+    def _build_network(self, network_type: str, ports: List[Dict] = None) -> Dict[str, Any]:
+        """Build the service and pod configuration for a network type"""
         network_config = self.network_types.get(network_type, {})
+        service_type = network_config.get('service', {}).get('type', 'ClusterIP')
+        service_ports = {}
         
         result = {
             'service': {
                 'main': {
                     'controller': 'main',
-                    'type': network_config.get('service', {}).get('type', 'ClusterIP'),
-                    'ports': {}
+                    'type': service_type,
+                    'ports': service_ports
                 }
             }
         }
@@ -51,19 +84,20 @@ class AppTranslator:
         
         # Configure ports
         if ports:
+            is_node_port = service_type == 'NodePort'
             for i, port_config in enumerate(ports):
                 port_name = port_config.get('name', f'port-{i}')
-                result['service']['main']['ports'][port_name] = {
+                port = service_ports[port_name] = {
                     'enabled': True,
                     'port': port_config['port'],
                     'targetPort': port_config.get('targetPort', port_config['port']),
                     'protocol': port_config.get('protocol', 'TCP')
                 }
                 
-                if network_config.get('service', {}).get('type') == 'NodePort' and 'nodePort' in port_config:
-                    result['service']['main']['ports'][port_name]['nodePort'] = port_config['nodePort']
+                if is_node_port and 'nodePort' in port_config:
+                    port['nodePort'] = port_config['nodePort']
         else:
-            result['service']['main']['ports']['http'] = {
+            service_ports['http'] = {
                 'enabled': True,
                 'port': 80,
                 'targetPort': 8080,
@@ -74,6 +108,9 @@ class AppTranslator:
     
     def translate_storage(self, storage_config: Dict[str, Any]) -> Dict[str, Any]:
         """Convert storage configuration to persistence"""
+        if not storage_config:
+            return {}
+        
         persistence = {}
         
         for volume_name, volume_config in storage_config.items():
@@ -105,6 +142,13 @@ class AppTranslator:
     
     def translate_resources(self, profile_name: str) -> Dict[str, Any]:
         """Convert resource profile to resources configuration"""
+        resources = self._resources_cache.get(profile_name)
+        if resources is None:
+            resources = self._resources_cache[profile_name] = self._build_resources(profile_name)
+        return resources
+    
+    def _build_resources(self, profile_name: str) -> Dict[str, Any]:
+        """Build the resources configuration for a resource profile"""
         profile = self.resource_profiles.get(profile_name, {})
         if not profile:
             return {}
@@ -132,6 +176,13 @@ class AppTranslator:
     
     def translate_node_selector(self, node_selector: str) -> Dict[str, Any]:
         """Convert node selector to pod options"""
+        pod_options = self._node_selector_cache.get(node_selector)
+        if pod_options is None:
+            pod_options = self._node_selector_cache[node_selector] = self._build_node_selector(node_selector)
+        return pod_options
+    
+    def _build_node_selector(self, node_selector: str) -> Dict[str, Any]:
+        """Build the pod options for a node selector"""
         node_config = self.node_selectors.get(node_selector, {})
         labels = node_config.get('labels', {})
         
@@ -148,6 +199,7 @@ class AppTranslator:
         if not enabled:
             return {}
         
+        host = f"{app_name}.{domain}"
         return {
             'ingress': {
                 'main': {
@@ -156,22 +208,13 @@ class AppTranslator:
                     'annotations': self.ingress_defaults.get('annotations', {}),
                     'hosts': [
                         {
-                            'host': f"{app_name}.{domain}",
-                            'paths': [
-                                {
-                                    'path': '/',
-                                    'pathType': 'Prefix',
-                                    'service': {
-                                        'identifier': 'main',
-                                        'port': 'http'
-                                    }
-                                }
-                            ]
+                            'host': host,
+                            'paths': INGRESS_PATHS
                         }
                     ],
                     'tls': [
                         {
-                            'hosts': [f"{app_name}.{domain}"],
+                            'hosts': [host],
                             'secretName': f"{app_name}-tls"
                         }
                     ]
@@ -197,16 +240,28 @@ class AppTranslator:
         }
         
         # Apply configurations with deep merge
-        configurations = [
-            ('profile', lambda: self.translate_resources(app_config.get('profile', cluster_config.get('defaults', {}).get('profile')))),
-            ('nodeSelector', lambda: self.translate_node_selector(app_config.get('nodeSelector', cluster_config.get('defaults', {}).get('nodeSelector')))),
-            ('network', lambda: self.translate_network(app_config.get('network', 'clusterip'), app_config.get('ports', []))),
-            ('storage', lambda: self.translate_storage(app_config['storage']) if 'storage' in app_config else {}),
-            ('ingress', lambda: self.translate_ingress(app_name, cluster_config.get('domain')) if cluster_config.get('domain') and app_config.get('ingress', True) else {})
-        ]
-        
-        for name, func in configurations:
-            config = func()
+        defaults = cluster_config.get('defaults', {})
+        
+        config = self.translate_resources(app_config.get('profile', defaults.get('profile')))
+        if config:
+            deep_merge(values, config)
+        
+        config = self.translate_node_selector(app_config.get('nodeSelector', defaults.get('nodeSelector')))
+        if config:
+            deep_merge(values, config)
+        
+        config = self.translate_network(app_config.get('network', 'clusterip'), app_config.get('ports', []))
+        if config:
+            deep_merge(values, config)
+        
+        if 'storage' in app_config:
+            config = self.translate_storage(app_config['storage'])
+            if config:
+                deep_merge(values, config)
+        
+        domain = cluster_config.get('domain')
+        if domain and app_config.get('ingress', True):
+            config = self.translate_ingress(app_name, domain)
             if config:
                 deep_merge(values, config)
         
@@ -2,22 +2,167 @@
 Utility functions for Maniforge
 """
 
+import hashlib
+import os
+import pickle
+import stat
+import threading
+import yaml
+from pathlib import Path
+from types import MappingProxyType
 from typing import Dict, Any
 
+# Prefer the libyaml-backed (C) loader and dumper when PyYAML was built with them
+try:
+    from yaml import CSafeLoader as YamlLoader, CSafeDumper as YamlDumper
+except ImportError:
+    from yaml import SafeLoader as YamlLoader, SafeDumper as YamlDumper
+
+
+class ManifestDumper(YamlDumper):
+    """YAML dumper for generated files; also emits the read-only platform defaults as plain mappings"""
+
+
+ManifestDumper.add_representer(MappingProxyType, lambda dumper, data: dumper.represent_dict(data))
+
+YAML_CACHE_DIR_ENV = 'MANIFORGE_CACHE_DIR'
+
+# Thread pool size for per-app and per-profile file work; only the file I/O runs in
+# parallel, since libyaml parsing and emission never release the GIL
+IO_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+
+
+def dump_yaml(data: Any) -> str:
+    """Render data as block-style YAML, preserving key order"""
+    return yaml.dump(data, Dumper=ManifestDumper, default_flow_style=False, sort_keys=False)
+
+
+def _yaml_cache_dir() -> Path:
+    """Directory holding pickled YAML parses ($MANIFORGE_CACHE_DIR or the user cache dir)"""
+    if os.getenv(YAML_CACHE_DIR_ENV):
+        return Path(os.environ[YAML_CACHE_DIR_ENV])
+    return Path(os.getenv('XDG_CACHE_HOME') or Path.home() / '.cache') / 'maniforge'
+
+
+def _is_private(st: os.stat_result) -> bool:
+    """Whether a cache dir or file belongs to the current user and is not writable by anyone else"""
+    if not hasattr(os, 'getuid'):
+        return True
+    return st.st_uid == os.getuid() and not st.st_mode & 0o022
+
+
+def load_yaml_cached(path: Path) -> Any:
+    """Load a YAML file, reusing a pickled parse from the cache dir while the file is unchanged.
+
+    There is one cache entry per source path, validated against the file's mtime and size.
+    Unpickling runs code from the cache, so entries are only read from a directory and
+    file owned by the current user and not writable by others; the cache dir must be private.
+    Any cache problem falls back to parsing the file.
+    """
+    path = Path(path).resolve()
+    source_stat = path.stat()
+    stamp = (source_stat.st_mtime_ns, source_stat.st_size)
+    cache_name = f"{hashlib.sha1(str(path).encode()).hexdigest()}.pkl"
+    
+    try:
+        cache_dir = _yaml_cache_dir()
+        cache_file = cache_dir / cache_name
+        if _is_private(os.stat(cache_dir)):
+            with open(cache_file, 'rb') as f:
+                if _is_private(os.fstat(f.fileno())):
+                    cached_stamp, data = pickle.load(f)
+                    if cached_stamp == stamp:
+                        return data
+    except Exception:
+        pass
+    
+    # Hand libyaml raw bytes; it detects the encoding itself, skipping the text codec layer
+    data = yaml.load(path.read_bytes(), Loader=YamlLoader)
+    
+    try:
+        cache_dir = _yaml_cache_dir()
+        cache_dir.mkdir(mode=0o700, parents=True, exist_ok=True)
+        _atomic_write_bytes(cache_dir / cache_name, pickle.dumps((stamp, data), protocol=pickle.HIGHEST_PROTOCOL), mode=0o600)
+    except Exception:
+        pass
+    
+    return data
+
+
+def _atomic_write_bytes(path: Path, data: bytes, mode: int = None):
+    """Write data to path via a sibling temp file and os.replace, so readers never see a partial file.
+
+    mode, if given, is applied to the new file before it replaces path.
+    """
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        if mode is not None:
+            os.chmod(tmp_path, mode)
+        os.replace(tmp_path, path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+
+def write_if_changed(path: Path, content: str) -> bool:
+    """Write content to path unless the file already holds exactly that content.
+
+    A symlinked path is written through to its target, and an existing file keeps its
+    permission bits. Returns True if the file was written.
+    """
+    data = content.encode('utf-8')
+    target = Path(os.path.realpath(path))
+    try:
+        if target.read_bytes() == data:
+            return False
+        mode = stat.S_IMODE(os.stat(target).st_mode)
+    except FileNotFoundError:
+        mode = None
+    _atomic_write_bytes(target, data, mode=mode)
+    return True
+
 
 def deep_merge(target: Dict, source: Dict):
     """Deep merge source dict into target dict"""
-    for key, value in source.items():
-        if key in target and isinstance(target[key], dict) and isinstance(value, dict):
-            deep_merge(target[key], value)
-        else:
-            target[key] = value
+    # Walk nested levels with an explicit stack instead of recursing
+    stack = [(target, source)]
+    while stack:
+        target, source = stack.pop()
+        for key, value in source.items():
+            existing = target.get(key)
+            if isinstance(existing, dict) and isinstance(value, dict):
+                stack.append((existing, value))
+            else:
+                target[key] = value
+
+
+def build_chart_section(helm_chart_config: Dict[str, Any]) -> Dict[str, Any]:
+    """Construct the HelmRelease spec.chart section for the configured chart.
+
+    The result is identical for every app, so build it once and share it across releases.
+    """
+    repository = helm_chart_config.get('repository', {})
+    return {
+        'spec': {
+            'chart': helm_chart_config.get('name', 'app-template'),
+            'version': helm_chart_config.get('version', '4.4.0'),
+            'sourceRef': {
+                'kind': 'HelmRepository',
+                'name': repository.get('name', 'bjw-s'),
+                'namespace': repository.get('namespace', 'flux-system')
+            }
+        }
+    }
 
 
-def build_helm_release(app_name: str, app_config: Dict[str, Any], values: Dict[str, Any], helm_chart_config: Dict[str, Any]) -> Dict[str, Any]:
+def build_helm_release(app_name: str, app_config: Dict[str, Any], values: Dict[str, Any], chart: Dict[str, Any]) -> Dict[str, Any]:
     """Construct a Flux HelmRelease manifest for an app.
 
     This centralizes the structure so generator and differ produce identical objects.
+    chart comes from build_chart_section() and is shared, not copied; only the
+    per-app metadata and spec levels are allocated here.
     """
     return {
         'apiVersion': 'helm.toolkit.fluxcd.io/v2beta2',
@@ -28,17 +173,7 @@ def build_helm_release(app_name: str, app_config: Dict[str, Any], values: Dict[s
         },
         'spec': {
             'interval': '1m',
-            'chart': {
-                'spec': {
-                    'chart': helm_chart_config.get('name', 'app-template'),
-                    'version': helm_chart_config.get('version', '4.4.0'),
-                    'sourceRef': {
-                        'kind': 'HelmRepository',
-                        'name': helm_chart_config.get('repository', {}).get('name', 'bjw-s'),
-                        'namespace': helm_chart_config.get('repository', {}).get('namespace', 'flux-system')
-                    }
-                }
-            },
+            'chart': chart,
             'values': values
         }
     }